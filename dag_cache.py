@@ -0,0 +1,130 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# COMPUTATION GRAPH CACHE
+# ------------------------------------------------------------
+# Every derived frame (cleaned data, hourly sales, basket, ...)
+# is a node keyed by the fingerprints of its inputs plus its
+# parameters. A node is only recomputed when upstream data or a
+# parameter changes. Results are kept in an LRU that is trimmed
+# to a memory budget.
+#
+# Cached values are shared between reruns and sessions, so
+# callers must treat them as read-only (copy before mutating).
+# ============================================================
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024  # bytes
+
+
+def content_fingerprint(value):
+    """Hash a value by content so equal inputs give equal keys."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        # Row hashes ignore dtype (int32 and int64 hash alike), so the
+        # dtypes are part of the key; digesting the ordered bytes keeps
+        # reordered rows from colliding
+        hashed = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        if isinstance(value, pd.DataFrame):
+            columns, dtypes = tuple(value.columns), tuple(map(str, value.dtypes))
+        else:
+            columns, dtypes = value.name, (str(value.dtype),)
+        digest = hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+        return ("pandas", value.shape, columns, dtypes, str(value.index.dtype), digest)
+    try:
+        return ("value", hash(value))
+    except TypeError:
+        return ("repr", repr(value))
+
+
+def estimate_size(value, _seen=None):
+    """Approximate memory held by a cached value, in bytes.
+
+    Containers and plain objects (e.g. a dict of per-partition sketches)
+    are sized by walking their contents, each object counted once.
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (value.nbytes if value.base is not None else 0)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), seen)
+    return size
+
+
+class ComputationGraph:
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._keys_by_id = {}          # id(cached value) -> key
+        self._used = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, value):
+        # Outputs of other nodes are identified by their own key, which
+        # avoids re-hashing large frames that came out of the cache.
+        with self._lock:
+            key = self._keys_by_id.get(id(value))
+        if key is not None:
+            return ("node", key)
+        return content_fingerprint(value)
+
+    def node(self, name, func, *inputs, **params):
+        """Return ``func(*inputs, **params)``, recomputing only when stale."""
+        key = (name,
+               tuple(self.fingerprint(i) for i in inputs),
+               tuple(sorted(params.items())))
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = func(*inputs, **params)
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (value, size)
+            self._keys_by_id[id(value)] = key
+            self._used += size
+            # Evict least recently used, but always keep the newest entry
+            while self._used > self.memory_budget and len(self._entries) > 1:
+                old_key, (old_value, old_size) = self._entries.popitem(last=False)
+                self._keys_by_id.pop(id(old_value), None)
+                self._used -= old_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+            self._used = 0
+
+    def stats(self):
+        with self._lock:
+            return {"nodes": len(self._entries), "bytes": self._used,
+                    "hits": self.hits, "misses": self.misses}
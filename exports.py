@@ -0,0 +1,78 @@
+import io
+
+import streamlit as st
+
+# ============================================================
+# TABLE EXPORTS
+# ------------------------------------------------------------
+# Download buttons for filtered tables. The file is only built
+# when the button is clicked, and it is written a chunk of rows
+# at a time, so a large table is never converted to one big
+# in-memory string first. Streamlit still holds the finished
+# file in memory while it serves the download.
+# ============================================================
+CHUNK_ROWS = 10_000
+
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df, fileobj, chunk_rows=CHUNK_ROWS):
+    # Header goes out with the first chunk only; empty tables still get one
+    if df.empty:
+        fileobj.write(df.to_csv(index=False).encode("utf-8"))
+        return
+    for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+        fileobj.write(chunk.to_csv(index=False, header=(i == 0)).encode("utf-8"))
+
+
+def write_parquet(df, fileobj, chunk_rows=CHUNK_ROWS):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Mixed-type object columns (e.g. barcodes) are written as text so
+    # every chunk has the same schema
+    text_cols = df.select_dtypes(include="object").columns
+    schema = None
+    writer = None
+    try:
+        for chunk in iter_chunks(df, chunk_rows) if len(df) else [df]:
+            chunk = chunk.astype({c: "string" for c in text_cols})
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(fileobj, schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+FORMATS = {
+    "csv": (write_csv, "text/csv"),
+    "parquet": (write_parquet, "application/vnd.apache.parquet"),
+}
+
+
+def export_file(df, fmt, chunk_rows=CHUNK_ROWS):
+    """Write ``df`` as ``fmt`` chunk by chunk and return the file as bytes."""
+    writer, _ = FORMATS[fmt]
+    buffer = io.BytesIO()
+    writer(df, buffer, chunk_rows)
+    return buffer.getvalue()
+
+
+def download_buttons(df, name, key):
+    """Show CSV and Parquet download buttons for ``df``."""
+    cols = st.columns([1] * len(FORMATS) + [8])
+    for col, (fmt, (_, mime)) in zip(cols, FORMATS.items()):
+        col.download_button(
+            f"⬇️ {fmt.upper()}",
+            data=lambda fmt=fmt: export_file(df, fmt),
+            file_name=f"{name}.{fmt}",
+            mime=mime,
+            key=f"{key}_{fmt}",
+            on_click="ignore",
+        )
@@ -0,0 +1,203 @@
+"""Local multi-user load test for the Streamlit dashboards.
+
+Simulates N concurrent sessions with Streamlit's AppTest, each one
+replaying a scripted set of interactions, and reports rerun latency
+(p50/p95) plus process RSS and CPU as N grows. Runs offline against
+the sample workbooks bundled with the repo:
+
+    python loadtest.py --app pos --sessions 1 2 4 8
+    python loadtest.py --app all --iterations 3
+"""
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+try:
+    import psutil
+except ImportError:  # optional, only used for current RSS
+    psutil = None
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Files each app expects in its working folder -> bundled sample
+SAMPLE_FILES = {
+    "pos.xlsx": "PosTransactionDetails.xlsx",
+    "july to sep safa2025.Xlsx": "july to sep safa2025.Xlsx",
+}
+PRICE_LIST = "price list(1).xlsx"
+
+RUN_TIMEOUT = 300  # seconds per rerun; first runs load the workbooks
+
+
+# ============================
+# Scenarios
+# ----------------------------
+# Each scenario drives one session and calls ``step`` around every
+# interaction so its rerun is timed.
+# ============================
+def variance_session(step, iterations):
+    at = AppTest.from_file(os.path.join(REPO_DIR, "variance.py"), default_timeout=RUN_TIMEOUT)
+    step(at.run)
+    step(at.text_input(key="password_input").input("123123").run)
+    for i in range(iterations):
+        categories = at.sidebar.selectbox[0].options
+        step(at.sidebar.selectbox[0].select(categories[1 + i % (len(categories) - 1)]).run)
+        step(at.sidebar.selectbox[0].select("All").run)
+        step(at.sidebar.text_input[0].input("CHICKEN").run)
+        step(at.sidebar.text_input[0].input("").run)
+
+
+def stock_session(step, iterations):
+    at = AppTest.from_file(os.path.join(REPO_DIR, "stock.py"), default_timeout=RUN_TIMEOUT)
+    step(at.run)
+    for i in range(iterations):
+        categories = at.sidebar.selectbox[0].options
+        gp_options = at.sidebar.selectbox[1].options
+        step(at.sidebar.selectbox[0].select(categories[1 + i % (len(categories) - 1)]).run)
+        step(at.sidebar.selectbox[1].select(gp_options[1 + i % (len(gp_options) - 1)]).run)
+        step(at.sidebar.selectbox[1].select("All").run)
+        step(at.sidebar.selectbox[0].select("All").run)
+
+
+def pos_session(step, iterations):
+    at = AppTest.from_file(os.path.join(REPO_DIR, "pos.py"), default_timeout=RUN_TIMEOUT)
+    step(at.run)
+    for i in range(iterations):
+        step(at.text_input[0].input(("628", "6281007", "9")[i % 3]).run)
+        step(at.text_input[0].input("").run)
+
+
+SCENARIOS = {
+    "variance": variance_session,
+    "stock": stock_session,
+    "pos": pos_session,
+}
+
+
+# ============================
+# Workspace
+# ============================
+def prepare_workdir():
+    """Stage the bundled workbooks under the names the apps load."""
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    for name, sample in SAMPLE_FILES.items():
+        shutil.copy(os.path.join(REPO_DIR, sample), os.path.join(workdir, name))
+
+    # No price list is bundled, so derive one from the sales sample
+    sales = pd.read_excel(os.path.join(workdir, "july to sep safa2025.Xlsx"))
+    price_list = pd.DataFrame({
+        "Item Bar Code": sales["Item Code"].astype(str),
+        "Item Name": sales["Items"],
+        "Cost": np.nan,
+        "Selling": np.nan,
+        "Stock": np.nan,
+    })
+    price_list.to_excel(os.path.join(workdir, PRICE_LIST), index=False)
+    return workdir
+
+
+# ============================
+# Process metrics
+# ============================
+def current_rss_mb():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    # ru_maxrss is the peak, in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def cpu_seconds():
+    t = os.times()
+    return t.user + t.system
+
+
+# ============================
+# Runner
+# ============================
+def run_load(app, sessions, iterations):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def step(action):
+        start = time.perf_counter()
+        at = action()
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if at.exception:
+                errors.append(at.exception[0].message)
+
+    def worker():
+        try:
+            SCENARIOS[app](step, iterations)
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    threads = [threading.Thread(target=worker) for _ in range(sessions)]
+    wall_start, cpu_start = time.perf_counter(), cpu_seconds()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "app": app,
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "p50_ms": np.percentile(latencies, 50) * 1000 if latencies else np.nan,
+        "p95_ms": np.percentile(latencies, 95) * 1000 if latencies else np.nan,
+        "wall_s": wall,
+        "cpu_%": (cpu_seconds() - cpu_start) / wall * 100,
+        "rss_mb": current_rss_mb(),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else "",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", choices=list(SCENARIOS) + ["all"], default="all")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrent session counts to try, in order")
+    parser.add_argument("--iterations", type=int, default=2,
+                        help="interaction rounds per session")
+    args = parser.parse_args()
+
+    apps = list(SCENARIOS) if args.app == "all" else [args.app]
+    workdir = prepare_workdir()
+    os.chdir(workdir)
+
+    results = []
+    try:
+        for app in apps:
+            # Warm-up session so the cached loads are not billed to N=1
+            run_load(app, 1, 0)
+            for n in args.sessions:
+                result = run_load(app, n, args.iterations)
+                results.append(result)
+                print(f"{app:>8}  N={n:<3} p50={result['p50_ms']:8.1f}ms  p95={result['p95_ms']:8.1f}ms  "
+                      f"cpu={result['cpu_%']:6.1f}%  rss={result['rss_mb']:7.1f}MB  errors={result['errors']}",
+                      flush=True)
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:,.1f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# PERIOD ENGINE
+# ------------------------------------------------------------
+# Sales exports come in a wide layout with one pair of columns
+# per month, e.g. "Jul-2025 Total Sales" / "Jul-2025 Total
+# Profit". This module melts that layout once into a long table
+# (item, period, sales, profit) with an ordered categorical
+# period, so month-over-month, rolling and variance analysis are
+# plain groupbys that work for any number of months and outlets.
+# ============================================================
+PERIOD_COLUMN = re.compile(r"^(?P<period>[A-Za-z]{3}-\d{4}) Total (?P<measure>Sales|Profit)$")
+
+MEASURES = ["sales", "profit"]
+
+
+def find_periods(columns):
+    """Return the periods present in a wide frame, oldest first."""
+    periods = {m.group("period") for m in map(PERIOD_COLUMN.match, map(str, columns)) if m}
+    return sorted(periods, key=lambda p: pd.to_datetime(p, format="%b-%Y"))
+
+
+def period_label(periods):
+    """Short heading for a span of periods, e.g. "Jul-Sep 2025"."""
+    if not periods:
+        return ""
+    first, last = periods[0].split("-"), periods[-1].split("-")
+    if first == last:
+        return f"{first[0]} {first[1]}"
+    if first[1] == last[1]:
+        return f"{first[0]}-{last[0]} {last[1]}"
+    return f"{first[0]} {first[1]} - {last[0]} {last[1]}"
+
+
+def period_column(period, measure):
+    return f"{period} Total {measure.capitalize()}"
+
+
+def to_long(df, id_cols=(), periods=None, item_col=None):
+    """Melt the wide period columns into one row per (item, period).
+
+    ``item`` comes from ``item_col`` (e.g. "Item Code") and falls back
+    to the row label when none is given. ``row`` always holds the
+    original row label so results can be joined back onto ``df``.
+    Missing period columns count as zero.
+    """
+    periods = list(periods) if periods is not None else find_periods(df.columns)
+    n, k = len(df), len(periods)
+    rows = np.repeat(np.arange(n), k)
+
+    long = df.iloc[rows][list(id_cols)].reset_index(drop=True)
+    long.insert(0, "row", df.index.to_numpy()[rows])
+    items = df[item_col].to_numpy() if item_col is not None else df.index.to_numpy()
+    long.insert(0, "item", items[rows])
+    long.attrs["item_col"] = item_col
+    long["period"] = pd.Categorical(np.tile(periods, n), categories=periods, ordered=True)
+
+    for measure in MEASURES:
+        values = np.zeros((n, k))
+        for j, period in enumerate(periods):
+            col = period_column(period, measure)
+            if col in df.columns:
+                values[:, j] = pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy()
+        long[measure] = values.reshape(-1)
+
+    return long
+
+
+def combine_outlets(frames):
+    """Stack long tables from several outlets, e.g. ``{"Safa": long_safa}``.
+
+    Each table must be keyed by an item column (``to_long(..., item_col=...)``)
+    so the same product lines up across outlets; row labels would collide.
+    Periods are unioned and kept in calendar order.
+    """
+    for outlet, frame in frames.items():
+        if frame.attrs.get("item_col") is None:
+            raise ValueError(f"Outlet {outlet!r} is keyed by row label; build it with item_col")
+
+    periods = sorted({p for f in frames.values() for p in f["period"].cat.categories},
+                     key=lambda p: pd.to_datetime(p, format="%b-%Y"))
+    parts = []
+    for outlet, frame in frames.items():
+        frame = frame.assign(outlet=outlet)
+        frame["period"] = frame["period"].cat.set_categories(periods, ordered=True)
+        parts.append(frame)
+    combined = pd.concat(parts, ignore_index=True)
+    combined.attrs["item_col"] = next(iter(frames.values())).attrs["item_col"]
+    combined["outlet"] = combined["outlet"].astype("category")
+    return combined
+
+
+def _gp(frame):
+    return (frame["profit"] / frame["sales"].replace(0, np.nan)).fillna(0)
+
+
+def item_totals(long, by=("item",)):
+    """Total sales, profit and GP per item (or any other key) over all periods."""
+    totals = long.groupby(list(by), observed=True, sort=False)[MEASURES].sum()
+    totals["gp"] = _gp(totals)
+    return totals
+
+
+def period_totals(long, by=()):
+    """Sales and profit per period, optionally split by e.g. outlet or Category."""
+    keys = list(by) + ["period"]
+    totals = long.groupby(keys, observed=True)[MEASURES].sum().reset_index()
+    totals["gp"] = _gp(totals)
+    return totals
+
+
+def period_deltas(totals, by=()):
+    """Add month-over-month change columns to a per-period table."""
+    totals = totals.sort_values(list(by) + ["period"]).copy()
+    grouped = totals.groupby(list(by), observed=True) if by else totals
+    for measure in MEASURES:
+        previous = grouped[measure].shift()
+        totals[f"{measure}_delta"] = totals[measure] - previous
+        totals[f"{measure}_delta_%"] = (totals[f"{measure}_delta"] / previous.replace(0, np.nan) * 100).round(2)
+    return totals
+
+
+def rolling_totals(totals, window, by=()):
+    """Add rolling sums over the last ``window`` periods to a per-period table."""
+    totals = totals.sort_values(list(by) + ["period"]).copy()
+    grouped = totals.groupby(list(by), observed=True) if by else totals
+    for measure in MEASURES:
+        rolled = grouped[measure].rolling(window, min_periods=1).sum()
+        if by:
+            rolled = rolled.reset_index(level=list(range(len(by))), drop=True)
+        totals[f"{measure}_rolling_{window}"] = rolled
+    return totals
+
+
+def variance_ranking(long, by=("item",), measure="sales"):
+    """Rank items by how much ``measure`` varies across periods, largest first."""
+    stats = long.groupby(list(by), observed=True, sort=False)[measure].agg(["mean", "std", "min", "max"])
+    stats["std"] = stats["std"].fillna(0)
+    stats["cv"] = (stats["std"] / stats["mean"].abs().replace(0, np.nan)).fillna(0)
+    return stats.sort_values("std", ascending=False)
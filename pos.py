@@ -1,7 +1,18 @@
+import time
+
+# Start of the run, taken before the heavy imports so time-to-first-render
+# includes them
+_RUN_START = time.perf_counter()
+
+import os
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from mlxtend.frequent_patterns import apriori, association_rules
+
+from dag_cache import ComputationGraph
+from exports import download_buttons
+from sketches import build_bill_stats, merge_bill_stats
 
 # ============================================================
 # PAGE SETTINGS
@@ -9,127 +20,238 @@ from mlxtend.frequent_patterns import apriori, association_rules
 st.set_page_config(page_title="POS Analytics", layout="wide")
 st.title("🛒 POS Billing Analytics Dashboard")
 
+# ============================================================
+# DERIVED FRAMES
+# ------------------------------------------------------------
+# Each step is a node in the computation graph, keyed by its
+# inputs and parameters, so reruns reuse anything unchanged.
+# ============================================================
+POS_FILE = "pos.xlsx"
+
+REQUIRED = ["barcode", "item_name", "qty", "pos_name", "tran_no",
+            "tran_date", "rate", "item_total"]
+
+
+@st.cache_resource
+def get_graph():
+    return ComputationGraph()
+
+
+def read_raw(path, mtime):
+    return pd.read_excel(path)
+
+
+def clean_frame(raw):
+    df = raw.copy()
+    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+    if "tran_date" in df.columns:
+        df["tran_date"] = pd.to_datetime(df["tran_date"], errors="coerce")
+    return df
+
+
+def add_time_columns(df):
+    df = df.copy()
+    df["hour"] = df["tran_date"].dt.hour
+    df["half_hour"] = df["tran_date"].dt.floor("30min")
+    return df
+
+
+def sales_by(df, column):
+    return df.groupby(column)["item_total"].sum().reset_index()
+
+
+def build_item_sales(df):
+    item_sales = df.groupby("item_name")["item_total"].sum().reset_index()
+    return item_sales.sort_values("item_total", ascending=False)
+
+
+def build_basket(df):
+    # One row per bill, one boolean column per item
+    basket = df.groupby(["pos_name", "tran_no"])["item_name"].apply(list)
+
+    unique_items = sorted(df["item_name"].unique())
+    encoded = pd.DataFrame(0, index=range(len(basket)), columns=unique_items)
+
+    for idx, items in enumerate(basket):
+        for it in items:
+            encoded.at[idx, it] = 1
+
+    return encoded.astype(bool)
+
+
+def build_rules(basket, min_support, min_confidence):
+    # mlxtend is slow to import, so only load it once rules are needed
+    from mlxtend.frequent_patterns import apriori, association_rules
+
+    freq_items = apriori(basket, min_support=min_support, use_colnames=True)
+    rules = association_rules(freq_items, metric="confidence", min_threshold=min_confidence)
+    if rules.empty:
+        return rules
+
+    rules["antecedents"] = rules["antecedents"].apply(lambda x: ", ".join(list(x)))
+    rules["consequents"] = rules["consequents"].apply(lambda x: ", ".join(list(x)))
+    rules["chance_%"] = (rules["confidence"] * 100).round(2)
+
+    final_rules = rules[["antecedents", "consequents", "support",
+                         "confidence", "lift", "chance_%"]]
+    return final_rules.sort_values("chance_%", ascending=False)
+
+
 # ============================================================
 # LOAD DATA
 # ============================================================
+graph = get_graph()
+
 try:
-    df = pd.read_excel("pos.xlsx")
+    raw = graph.node("raw", read_raw, path=POS_FILE, mtime=os.path.getmtime(POS_FILE))
 except:
     st.error("❌ pos.xlsx not found — place the file in the app folder.")
     st.stop()
 
-# Clean columns
-df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
-
-required = ["barcode", "item_name", "qty", "pos_name", "tran_no",
-            "tran_date", "rate", "item_total"]
+df = graph.node("clean", clean_frame, raw)
 
-for c in required:
+for c in REQUIRED:
     if c not in df.columns:
         st.error(f"Missing column: {c}")
         st.stop()
 
-df["tran_date"] = pd.to_datetime(df["tran_date"], errors="coerce")
+# Per terminal/day bill summaries, stored alongside the cleaned data
+bill_stats = graph.node("bill_stats", build_bill_stats, df, outlet=POS_FILE)
 
 st.success("✔ Data loaded successfully!")
 
 # ============================================================
-# BARCODE SEARCH
+# SECTIONS
+# ------------------------------------------------------------
+# Each section only receives the data it needs. Sections with
+# widgets are fragments, so interacting with one reruns that
+# section alone instead of the whole dashboard.
 # ============================================================
-st.subheader("🔍 Search by Barcode")
+@st.fragment
+def barcode_search(df):
+    st.subheader("🔍 Search by Barcode")
 
-barcode = st.text_input("Enter barcode to search", "")
+    barcode = st.text_input("Enter barcode to search", "")
 
-if barcode:
-    result = df[df["barcode"].astype(str).str.contains(barcode)]
-    st.write(f"Results for: **{barcode}**")
-    st.dataframe(result)
+    if barcode:
+        result = df[df["barcode"].astype(str).str.contains(barcode)]
+        st.write(f"Results for: **{barcode}**")
+        st.dataframe(result)
+        download_buttons(result, "barcode_search", key="barcode_result")
 
-# ============================================================
-# KPIs
-# ============================================================
-st.subheader("📊 Key Metrics")
 
-total_sales = df["item_total"].sum()
-total_items = df["qty"].sum()
-total_bills = df.groupby(["pos_name", "tran_no"]).ngroups
-avg_basket_value = total_sales / total_bills
+@st.fragment
+def key_metrics(bill_stats):
+    st.subheader("📊 Key Metrics")
 
-c1, c2, c3, c4 = st.columns(4)
-c1.metric("Total Sales", f"{total_sales:,.2f}")
-c2.metric("Total Bills", total_bills)
-c3.metric("Items Sold", int(total_items))
-c4.metric("Avg Basket Value", f"{avg_basket_value:,.2f}")
+    # KPIs come from merging the per-partition bill sketches
+    terminals = sorted({pos_name for _, pos_name, _ in bill_stats})
+    dates = sorted(d for _, _, d in bill_stats if pd.notna(d))
 
-# ============================================================
-# HOURLY SALES (BAR CHART)
-# ============================================================
-st.subheader("⏰ Hourly Sales Trend")
+    f1, f2 = st.columns(2)
+    selected_terminals = f1.multiselect("Terminals", terminals, default=terminals)
+    date_range = f2.date_input("Date range", (dates[0], dates[-1]) if dates else ())
 
-df["hour"] = df["tran_date"].dt.hour
-hour_sales = df.groupby("hour")["item_total"].sum().reset_index()
+    start, end = (date_range + (None, None))[:2] if dates else (None, None)
+    end = end or start
+    narrowed = bool(dates) and (start, end) != (dates[0], dates[-1])
 
-fig_hour = px.bar(hour_sales, x="hour", y="item_total",
-                  title="Hourly Sales", text_auto=True)
-st.plotly_chart(fig_hour, use_container_width=True)
+    # Lines whose date did not parse only drop out once the range is narrowed
+    stats = merge_bill_stats(bill_stats, terminals=set(selected_terminals),
+                             start=start if narrowed else None,
+                             end=end if narrowed else None)
 
-# ============================================================
-# HALF-HOUR INTERVAL SALES (LINE CHART)
-# ============================================================
-st.subheader("🕒 Half-Hour Interval Sales Trend")
+    if narrowed:
+        undated = merge_bill_stats({k: v for k, v in bill_stats.items() if pd.isna(k[2])},
+                                   terminals=set(selected_terminals))
+        if undated.bills.count():
+            st.caption(f"Undated bills excluded by the date filter: {undated.bills.count()} "
+                       f"({undated.sales:,.2f} sales)")
 
-df["half_hour"] = df["tran_date"].dt.floor("30min")
-hh_sales = df.groupby("half_hour")["item_total"].sum().reset_index()
+    total_bills = stats.bills.count()
 
-fig_hh = px.line(hh_sales, x="half_hour", y="item_total",
-                 title="Half-Hour Sales Trend", markers=True)
-st.plotly_chart(fig_hh, use_container_width=True)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Total Sales", f"{stats.sales:,.2f}")
+    c2.metric("Total Bills", total_bills if stats.bills.is_exact else f"~{total_bills:,}")
+    c3.metric("Items Sold", int(stats.items))
+    c4.metric("Avg Basket Value", f"{stats.avg_basket_value:,.2f}")
 
-# ============================================================
-# TOP SELLING ITEMS
-# ============================================================
-st.subheader("🏆 Top 20 Selling Items")
+    with st.expander("Bill value and size distribution"):
+        h1, h2 = st.columns(2)
+        h1.plotly_chart(px.bar(stats.bill_values.to_frame(), x="range", y="bills",
+                               title="Bills by Value"), use_container_width=True)
+        h2.plotly_chart(px.bar(stats.bill_sizes.to_frame(), x="range", y="bills",
+                               title="Bills by Number of Lines"), use_container_width=True)
 
-item_sales = df.groupby("item_name")["item_total"].sum().reset_index()
-item_sales = item_sales.sort_values("item_total", ascending=False)
 
-fig_top = px.bar(item_sales.head(20), x="item_total", y="item_name",
-                 orientation="h", title="Top Selling Items")
-st.plotly_chart(fig_top, use_container_width=True)
+def hourly_sales(df):
+    st.subheader("⏰ Hourly Sales Trend")
 
-# ============================================================
-# MARKET BASKET ANALYSIS (TOP 30 WITH % CHANCE)
-# ============================================================
-st.subheader("🤝 Items Bought Together — Top 30 with % Chance")
+    timed = graph.node("time_columns", add_time_columns, df)
+    hour_sales = graph.node("sales_by", sales_by, timed, column="hour")
 
-# Build transaction basket
-basket = df.groupby(["pos_name", "tran_no"])["item_name"].apply(list)
+    fig_hour = px.bar(hour_sales, x="hour", y="item_total",
+                      title="Hourly Sales", text_auto=True)
+    st.plotly_chart(fig_hour, use_container_width=True)
 
-# Create unique item list
-unique_items = sorted(df["item_name"].unique())
-encoded = pd.DataFrame(0, index=basket.index, columns=unique_items)
 
-for idx, items in enumerate(basket):
-    for it in items:
-        encoded.at[idx, it] = 1
+def half_hour_sales(df):
+    st.subheader("🕒 Half-Hour Interval Sales Trend")
 
-# Apriori Algorithm
-freq_items = apriori(encoded, min_support=0.02, use_colnames=True)
-rules = association_rules(freq_items, metric="confidence", min_threshold=0.2)
+    timed = graph.node("time_columns", add_time_columns, df)
+    hh_sales = graph.node("sales_by", sales_by, timed, column="half_hour")
 
-if rules.empty:
-    st.warning("⚠️ Not enough data to generate rules.")
-else:
-    rules["antecedents"] = rules["antecedents"].apply(lambda x: ", ".join(list(x)))
-    rules["consequents"] = rules["consequents"].apply(lambda x: ", ".join(list(x)))
-    rules["chance_%"] = (rules["confidence"] * 100).round(2)
+    fig_hh = px.line(hh_sales, x="half_hour", y="item_total",
+                     title="Half-Hour Sales Trend", markers=True)
+    st.plotly_chart(fig_hh, use_container_width=True)
 
-    final_rules = rules[["antecedents", "consequents", "support",
-                         "confidence", "lift", "chance_%"]]
 
-    final_rules = final_rules.sort_values("chance_%", ascending=False)
+def top_items(df):
+    st.subheader("🏆 Top 20 Selling Items")
+
+    item_sales = graph.node("item_sales", build_item_sales, df)
+
+    fig_top = px.bar(item_sales.head(20), x="item_total", y="item_name",
+                     orientation="h", title="Top Selling Items")
+    st.plotly_chart(fig_top, use_container_width=True)
+    download_buttons(item_sales, "item_sales", key="item_sales")
+
+
+@st.fragment
+def market_basket(df):
+    st.subheader("🤝 Items Bought Together — Top 30 with % Chance")
+
+    # Rules (and the mlxtend import behind them) are only built once asked for
+    if not st.toggle("Show items bought together", key="show_basket"):
+        return
+
+    min_support = st.slider("Minimum support", 0.005, 0.2, 0.02, step=0.005,
+                            format="%.3f")
+
+    basket = graph.node("basket", build_basket, df)
+    final_rules = graph.node("rules", build_rules, basket,
+                             min_support=min_support, min_confidence=0.2)
+
+    if final_rules.empty:
+        st.warning("⚠️ Not enough data to generate rules.")
+        return
 
     st.dataframe(final_rules.head(30), height=500)
+    download_buttons(final_rules, "basket_rules", key="basket_rules")
 
-st.info("✔ Dashboard Ready")
 
+# ============================================================
+# DASHBOARD
+# ============================================================
+barcode_search(df)
+key_metrics(bill_stats)
+hourly_sales(df)
+half_hour_sales(df)
+top_items(df)
+
+# Everything above the basket analysis is the first render
+st.caption(f"⏱ First render in {time.perf_counter() - _RUN_START:.2f}s")
+
+market_basket(df)
+
+st.info("✔ Dashboard Ready")
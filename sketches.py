@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# BILL SKETCHES
+# ------------------------------------------------------------
+# Small, mergeable summaries of the bills in one partition
+# (outlet, terminal, day). KPIs for any mix of partitions come
+# from merging their summaries instead of regrouping raw lines.
+#
+# Distinct bills are counted exactly while a sketch holds few
+# of them and switch to HyperLogLog above a threshold. Bill
+# value and bill size are kept as fixed-bin histograms so they
+# merge by adding counts.
+# ============================================================
+EXACT_THRESHOLD = 4096
+HLL_PRECISION = 12  # 4096 registers, ~1.6% standard error
+
+VALUE_BINS = [0, 5, 10, 20, 50, 100, 200, 500, 1000, np.inf]
+SIZE_BINS = [1, 2, 3, 4, 6, 11, 21, 51, np.inf]  # lines per bill
+
+# Partition name for lines without a terminal
+UNASSIGNED = "Unassigned"
+
+
+def _bit_length(x):
+    # Vectorized int.bit_length for uint64 arrays
+    x = x.copy()
+    n = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= (np.uint64(1) << np.uint64(shift))
+        n[big] += shift
+        x[big] >>= np.uint64(shift)
+    return n + (x > 0)
+
+
+class DistinctSketch:
+    """Distinct count over 64-bit hashes: exact when small, HyperLogLog when large."""
+
+    def __init__(self, threshold=EXACT_THRESHOLD, precision=HLL_PRECISION):
+        self.threshold = threshold
+        self.precision = precision
+        self.exact = set()
+        self.registers = None
+
+    @property
+    def is_exact(self):
+        return self.registers is None
+
+    def add_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if self.is_exact:
+            self.exact.update(hashes.tolist())
+            if len(self.exact) > self.threshold:
+                self._to_hll()
+        else:
+            self._add_to_registers(hashes)
+        return self
+
+    def _to_hll(self):
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        self._add_to_registers(np.fromiter(self.exact, dtype=np.uint64, count=len(self.exact)))
+        self.exact = set()
+
+    def _add_to_registers(self, hashes):
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        rest = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        # Position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (np.uint8(64 - self.precision) - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """Return a new sketch counting the union of both."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        merged = DistinctSketch(self.threshold, self.precision)
+        if self.is_exact and other.is_exact:
+            merged.exact = self.exact | other.exact
+            if len(merged.exact) > merged.threshold:
+                merged._to_hll()
+            return merged
+
+        merged.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        for sketch in (self, other):
+            if sketch.is_exact:
+                merged.add_hashes(np.fromiter(sketch.exact, dtype=np.uint64, count=len(sketch.exact)))
+            else:
+                np.maximum(merged.registers, sketch.registers, out=merged.registers)
+        return merged
+
+    def count(self):
+        if self.is_exact:
+            return len(self.exact)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        # Linear counting is more accurate for small cardinalities
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class Histogram:
+    """Counts over fixed bin edges; merging adds the counts.
+
+    ``discrete`` histograms hold whole numbers and label their bins
+    inclusively (e.g. "3–5" for edges 3 and 6).
+    """
+
+    def __init__(self, edges, counts=None, discrete=False):
+        self.edges = list(edges)
+        self.discrete = discrete
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64) if counts is None else counts
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        idx = np.searchsorted(self.edges, values, side="right") - 1
+        idx = np.clip(idx, 0, len(self.counts) - 1)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        if other.edges != self.edges:
+            raise ValueError("Cannot merge histograms with different bins")
+        return Histogram(self.edges, self.counts + other.counts, self.discrete)
+
+    def _label(self, lo, hi):
+        if hi == np.inf:
+            return f"{lo:g}+"
+        if not self.discrete:
+            return f"{lo:g}–{hi:g}"
+        return f"{lo:g}" if hi - lo == 1 else f"{lo:g}–{hi - 1:g}"
+
+    def to_frame(self):
+        labels = [self._label(lo, hi) for lo, hi in zip(self.edges[:-1], self.edges[1:])]
+        return pd.DataFrame({"range": labels, "bills": self.counts})
+
+
+class BillStats:
+    """Mergeable summary of the bills in one partition."""
+
+    def __init__(self):
+        self.sales = 0.0
+        self.items = 0.0
+        self.bills = DistinctSketch()
+        self.bill_values = Histogram(VALUE_BINS)
+        self.bill_sizes = Histogram(SIZE_BINS, discrete=True)
+
+    def merge(self, other):
+        merged = BillStats()
+        merged.sales = self.sales + other.sales
+        merged.items = self.items + other.items
+        merged.bills = self.bills.merge(other.bills)
+        merged.bill_values = self.bill_values.merge(other.bill_values)
+        merged.bill_sizes = self.bill_sizes.merge(other.bill_sizes)
+        return merged
+
+    @property
+    def avg_basket_value(self):
+        bills = self.bills.count()
+        return self.sales / bills if bills else 0.0
+
+
+def build_bill_stats(df, outlet):
+    """Summarize a cleaned POS frame into BillStats per (outlet, pos_name, date).
+
+    Lines without a terminal or transaction number still count towards
+    sales and items but not towards bills, matching a dropna groupby;
+    lines without a terminal go to the UNASSIGNED partition. A bill
+    whose lines fall on two dates is counted once by the distinct
+    sketch but appears in both days' histograms.
+    """
+    has_bill = (df["pos_name"].notna() & df["tran_no"].notna()).to_numpy()
+    lines = pd.DataFrame({
+        "pos_name": df["pos_name"].astype(str).where(df["pos_name"].notna(), UNASSIGNED),
+        "date": df["tran_date"].dt.date,
+        "tran_no": df["tran_no"].astype(str),
+        "item_total": df["item_total"],
+        "qty": df["qty"],
+    })
+    lines["bill_hash"] = pd.util.hash_pandas_object(
+        lines[["pos_name", "tran_no"]].assign(outlet=outlet), index=False).to_numpy()
+    lines = lines.assign(has_bill=has_bill)
+
+    partitions = {}
+    for (pos_name, date), part in lines.groupby(["pos_name", "date"], dropna=False):
+        bills = (part[part["has_bill"]].groupby("bill_hash")
+                 .agg(value=("item_total", "sum"), lines=("item_total", "size")))
+
+        stats = BillStats()
+        stats.sales = float(part["item_total"].sum())
+        stats.items = float(part["qty"].sum())
+        stats.bills.add_hashes(bills.index.to_numpy())
+        stats.bill_values.add(bills["value"].to_numpy())
+        stats.bill_sizes.add(bills["lines"].to_numpy())
+        partitions[(outlet, pos_name, date)] = stats
+    return partitions
+
+
+def merge_bill_stats(partitions, outlets=None, terminals=None, start=None, end=None):
+    """Merge the partitions matching the given outlets, terminals and date range.
+
+    Undated partitions (NaT) are only included when no date bound is given.
+    """
+    merged = BillStats()
+    for (outlet, pos_name, date), stats in partitions.items():
+        if outlets is not None and outlet not in outlets:
+            continue
+        if terminals is not None and pos_name not in terminals:
+            continue
+        if (start is not None or end is not None) and pd.isna(date):
+            continue
+        if start is not None and date < start:
+            continue
+        if end is not None and date > end:
+            continue
+        merged = merged.merge(stats)
+    return merged
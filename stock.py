@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from exports import download_buttons
+
 # ============================
 # Page Config
 # ============================
@@ -102,6 +104,7 @@ else:
         st.info("No items match the selected filters.")
     else:
         st.dataframe(filtered_df.reset_index(drop=True))
+        download_buttons(filtered_df, "filtered_items", key="filtered_items")
 
         # ============================
         # Category-wise Count of Negative GP% Items
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The dashboards are flat scripts; make their helper modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
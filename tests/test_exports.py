@@ -0,0 +1,46 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from exports import export_file
+
+
+@pytest.fixture
+def table():
+    n = 25_000
+    return pd.DataFrame({
+        "barcode": [i if i % 2 else f"628{i}" for i in range(n)],
+        "item_name": [f"item {i}" for i in range(n)],
+        "item_total": np.arange(n) * 0.5,
+    })
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_export_is_accepted_by_download_button(table, fmt):
+    data, _ = convert_data_to_bytes_and_infer_mime(
+        export_file(table, fmt, chunk_rows=10_000), ValueError("unsupported"))
+    assert isinstance(data, bytes) and data
+
+
+def test_csv_export_round_trips(table):
+    data = export_file(table, "csv", chunk_rows=10_000)
+    result = pd.read_csv(io.BytesIO(data))
+    assert len(result) == len(table)
+    assert list(result.columns) == list(table.columns)
+
+
+def test_parquet_export_round_trips(table):
+    data = export_file(table, "parquet", chunk_rows=10_000)
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_rows == len(table)
+    assert parquet.num_row_groups == 3
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_empty_export(table, fmt):
+    data = export_file(table.head(0), fmt)
+    assert data
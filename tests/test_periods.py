@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from periods import (combine_outlets, find_periods, item_totals, period_totals,
+                     rolling_totals, to_long, variance_ranking)
+
+
+def wide(codes, jul, aug, index=None):
+    return pd.DataFrame({
+        "Item Code": codes,
+        "Jul-2025 Total Sales": jul,
+        "Jul-2025 Total Profit": [v / 10 for v in jul],
+        "Aug-2025 Total Sales": aug,
+        "Aug-2025 Total Profit": [v / 10 for v in aug],
+    }, index=index)
+
+
+def test_find_periods_orders_by_calendar():
+    cols = ["Sep-2025 Total Sales", "Jul-2025 Total Profit", "Dec-2024 Total Sales", "Items"]
+    assert find_periods(cols) == ["Dec-2024", "Jul-2025", "Sep-2025"]
+
+
+def test_to_long_handles_duplicate_row_labels():
+    df = wide(["A", "B", "C"], [1, 2, 3], [4, 5, 6], index=[0, 0, 1])
+    long = to_long(df, item_col="Item Code")
+    assert len(long) == 6
+    assert item_totals(long)["sales"].to_dict() == {"A": 5, "B": 7, "C": 9}
+
+
+def test_combine_outlets_keeps_items_apart():
+    x = to_long(wide(["A"], [100], [0]), item_col="Item Code")
+    y = to_long(wide(["B"], [0], [9]), item_col="Item Code")
+    combined = combine_outlets({"x": x, "y": y})
+
+    assert item_totals(combined)["sales"].to_dict() == {"A": 100, "B": 9}
+    assert set(variance_ranking(combined).index) == {"A", "B"}
+    by_outlet = period_totals(combined, by=["outlet"])
+    assert by_outlet["sales"].tolist() == [100, 0, 0, 9]
+
+
+def test_combine_outlets_unions_periods_and_sums_shared_items():
+    x = to_long(wide(["A"], [1], [2]), item_col="Item Code")
+    y = to_long(pd.DataFrame({"Item Code": ["A"], "Sep-2025 Total Sales": [4]}),
+                item_col="Item Code")
+    combined = combine_outlets({"x": x, "y": y})
+    assert list(combined["period"].cat.categories) == ["Jul-2025", "Aug-2025", "Sep-2025"]
+    assert item_totals(combined).loc["A", "sales"] == 7
+
+
+def test_combine_outlets_rejects_row_keyed_tables():
+    with pytest.raises(ValueError):
+        combine_outlets({"x": to_long(wide(["A"], [1], [2]))})
+
+
+def test_rolling_totals_per_outlet():
+    x = to_long(wide(["A"], [1], [2]), item_col="Item Code")
+    y = to_long(wide(["A"], [10], [20]), item_col="Item Code")
+    totals = period_totals(combine_outlets({"x": x, "y": y}), by=["outlet"])
+    rolled = rolling_totals(totals, window=2, by=["outlet"])
+    assert rolled["sales_rolling_2"].tolist() == [1, 3, 10, 30]
+
+    overall = rolling_totals(period_totals(x), window=2)
+    assert overall["sales_rolling_2"].tolist() == [1, 3]
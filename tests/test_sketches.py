@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from sketches import UNASSIGNED, DistinctSketch, build_bill_stats, merge_bill_stats
+
+
+def lines(**overrides):
+    df = pd.DataFrame({
+        "pos_name": ["POS1", "POS1", "POS1", "POS2", "POS2"],
+        "tran_no": [1.0, 1.0, 2.0, 1.0, 3.0],
+        "tran_date": pd.to_datetime(["2025-10-03 10:00"] * 3 + ["2025-10-04 11:00"] * 2),
+        "item_total": [10.0, 5.0, 2.5, 7.0, 1.0],
+        "qty": [1.0, 0.35, 2.0, 1.0, 0.5],
+    })
+    return df.assign(**overrides)
+
+
+def test_kpis_match_groupby():
+    df = lines()
+    stats = merge_bill_stats(build_bill_stats(df, "x"))
+    assert stats.sales == df["item_total"].sum()
+    assert stats.items == df["qty"].sum()
+    assert stats.bills.count() == df.groupby(["pos_name", "tran_no"]).ngroups
+
+
+def test_bill_size_counts_lines_not_quantity():
+    stats = merge_bill_stats(build_bill_stats(lines(), "x"))
+    sizes = stats.bill_sizes.to_frame().set_index("range")["bills"]
+    assert sizes["1"] == 3 and sizes["2"] == 1
+
+
+def test_missing_keys_count_sales_but_not_bills():
+    df = lines(tran_no=[1.0, 1.0, 2.0, np.nan, np.nan],
+               pos_name=["POS1", "POS1", None, "POS2", "POS2"])
+    partitions = build_bill_stats(df, "x")
+    stats = merge_bill_stats(partitions)
+
+    assert stats.bills.count() == df.groupby(["pos_name", "tran_no"]).ngroups == 1
+    assert stats.sales == df["item_total"].sum()
+    assert any(pos_name == UNASSIGNED for _, pos_name, _ in partitions)
+
+
+def test_sketch_is_exact_then_approximate():
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2 ** 63, 50_000, dtype=np.uint64) * 2 + 1
+
+    small = DistinctSketch().add_hashes(hashes[:1000])
+    assert small.is_exact and small.count() == 1000
+
+    a = DistinctSketch().add_hashes(hashes[:30_000])
+    b = DistinctSketch().add_hashes(hashes[20_000:])
+    merged = a.merge(b)
+    assert not merged.is_exact
+    assert abs(merged.count() - 50_000) / 50_000 < 0.05
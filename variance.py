@@ -1,7 +1,16 @@
+import os
+from functools import partial
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from dag_cache import ComputationGraph
+from exports import download_buttons
+from periods import (find_periods, period_label, period_column, to_long, item_totals,
+                     period_totals, period_deltas, rolling_totals,
+                     variance_ranking)
+
 # ================================
 # Password Protection
 # ================================
@@ -24,7 +33,6 @@ if not st.session_state.authenticated:
 # Page Config
 # ================================
 st.set_page_config(page_title="Sales & Profit Dashboard", layout="wide")
-st.title("📊 Sales & Profit Insights (Jul-Sep)")
 
 # ================================
 # Load Data
@@ -41,6 +49,20 @@ def load_price_list(file_path):
     df_price['Item Bar Code'] = df_price['Item Bar Code'].astype(str)
     return df_price
 
+@st.cache_resource
+def get_graph():
+    return ComputationGraph()
+
+def build_category_summary(long, categories, **key):
+    # ``key`` (category filter, source file) only identifies the cached node
+    totals = item_totals(long, by=("row",)).rename(columns={'sales':'Total Sales','profit':'Total Profit'})
+    totals['Category'] = categories.reindex(totals.index).to_numpy()
+    category_summary = totals.groupby('Category').agg({'Total Sales':'sum','Total Profit':'sum'}).reset_index()
+    category_summary['GP'] = category_summary['Total Profit'] / category_summary['Total Sales'].replace(0,1)
+    return category_summary
+
+graph = get_graph()
+
 # ================================
 # File paths
 # ================================
@@ -49,8 +71,14 @@ price_file = "price list(1).xlsx"       # replace with your file
 sales_df = load_sales_data(sales_file)
 price_df = load_price_list(price_file)
 
+# Months present in the sales file, oldest first
+periods = find_periods(sales_df.columns)
+period_cols = [period_column(p, m) for p in periods for m in ('sales', 'profit')]
+
+st.title(f"📊 Sales & Profit Insights ({period_label(periods)})" if periods else "📊 Sales & Profit Insights")
+
 # Fill missing sales columns if not in sales
-for col in ['Jul-2025 Total Sales','Jul-2025 Total Profit', 'Aug-2025 Total Sales','Aug-2025 Total Profit', 'Sep-2025 Total Sales','Sep-2025 Total Profit']:
+for col in period_cols:
     if col not in sales_df.columns:
         sales_df[col] = 0
 
@@ -80,8 +108,7 @@ if item_search or barcode_search:
     # Merge with sales data
     filtered_df = pd.merge(search_base, sales_df, left_on='Item Bar Code', right_on='Item Code', how='left')
     # Fill missing sales/profit columns
-    sales_cols = ['Jul-2025 Total Sales','Jul-2025 Total Profit', 'Aug-2025 Total Sales','Aug-2025 Total Profit', 'Sep-2025 Total Sales','Sep-2025 Total Profit']
-    for col in sales_cols:
+    for col in period_cols:
         if col not in filtered_df.columns:
             filtered_df[col] = 0
         else:
@@ -110,15 +137,13 @@ if selected_category != "All" and not (item_search or barcode_search):
 # ================================
 # Compute Totals
 # ================================
-def compute_row_totals(row):
-    sales_cols = ['Jul-2025 Total Sales','Aug-2025 Total Sales','Sep-2025 Total Sales']
-    profit_cols = ['Jul-2025 Total Profit','Aug-2025 Total Profit','Sep-2025 Total Profit']
-    total_sales = sum([row[col] if pd.notna(row[col]) else 0 for col in sales_cols])
-    total_profit = sum([row[col] if pd.notna(row[col]) else 0 for col in profit_cols])
-    overall_gp = (total_profit / total_sales) if total_sales != 0 else 0
-    return pd.Series([total_sales, total_profit, overall_gp])
+# One row per (item, month); everything below is a groupby on this
+long_df = graph.node("long", to_long, filtered_df[period_cols], periods=tuple(periods))
 
-filtered_df[['Total Sales','Total Profit','Overall GP']] = filtered_df.apply(compute_row_totals, axis=1)
+totals = item_totals(long_df, by=("row",)).reindex(filtered_df.index, fill_value=0)
+filtered_df['Total Sales'] = totals['sales']
+filtered_df['Total Profit'] = totals['profit']
+filtered_df['Overall GP'] = totals['gp']
 
 # ================================
 # Key Metrics
@@ -142,28 +167,47 @@ col3.metric("Overall GP", f"{overall_gp:.2%}")
 # ================================
 if not (item_search or barcode_search):
     st.markdown("### 📅 Month-wise Performance")
-    months = ['Jul-2025','Aug-2025','Sep-2025']
-    month_data = []
-    for month in months:
-        sales_col = f'{month} Total Sales'
-        profit_col = f'{month} Total Profit'
-        month_sales = filtered_df[sales_col].sum() if sales_col in filtered_df.columns else 0
-        month_profit = filtered_df[profit_col].sum() if profit_col in filtered_df.columns else 0
-        month_data.append({'Month': month, 'Type': 'Sales', 'Value': month_sales})
-        month_data.append({'Month': month, 'Type': 'Profit', 'Value': month_profit})
-    monthly_df = pd.DataFrame(month_data)
+    monthly = period_totals(long_df)
+    monthly_df = monthly.melt(id_vars='period', value_vars=['sales', 'profit'], var_name='Type', value_name='Value')
+    monthly_df = monthly_df.rename(columns={'period': 'Month'})
+    monthly_df['Type'] = monthly_df['Type'].str.capitalize()
     fig_monthly = px.bar(
         monthly_df, x='Month', y='Value', color='Type', barmode='group', text='Value',
         title="Monthly Sales & Profit"
     )
     st.plotly_chart(fig_monthly, use_container_width=True)
 
+    # Month-over-month change
+    if len(periods) > 1:
+        mom = rolling_totals(period_deltas(monthly), window=3)
+        mom = mom.rename(columns={'period': 'Month', 'sales': 'Sales', 'profit': 'Profit',
+                                  'sales_delta': 'Sales Change', 'sales_delta_%': 'Sales Change %',
+                                  'profit_delta': 'Profit Change', 'profit_delta_%': 'Profit Change %',
+                                  'sales_rolling_3': 'Sales (3-Month Rolling)',
+                                  'profit_rolling_3': 'Profit (3-Month Rolling)'})
+        st.markdown("#### 🔁 Month-over-Month Change")
+        st.dataframe(mom[['Month','Sales','Sales Change','Sales Change %','Sales (3-Month Rolling)',
+                          'Profit','Profit Change','Profit Change %','Profit (3-Month Rolling)']],
+                     hide_index=True)
+
+        # Items whose monthly sales swing the most
+        st.markdown("#### 📈 Most Variable Items")
+        ranking = variance_ranking(long_df, by=("row",)).head(20)
+        ranking = filtered_df[['Items', 'Category']].join(ranking, how='inner')
+        ranking = ranking.sort_values('std', ascending=False).rename(columns={
+            'mean': 'Avg Monthly Sales', 'std': 'Std Dev', 'min': 'Min Month', 'max': 'Max Month', 'cv': 'CV'})
+        st.dataframe(ranking, hide_index=True)
+
 # ================================
 # Category-wise Analysis
 # ================================
 if not (item_search or barcode_search):
-    category_summary = filtered_df.groupby('Category').agg({'Total Sales':'sum','Total Profit':'sum'}).reset_index()
-    category_summary['GP'] = category_summary['Total Profit'] / category_summary['Total Sales'].replace(0,1)
+    # Keyed on the long node (already fingerprinted) plus what decides each
+    # row's category, so no fresh slice is hashed on every rerun
+    category_summary = graph.node("category_summary",
+                                  partial(build_category_summary, categories=filtered_df['Category']),
+                                  long_df, category=selected_category,
+                                  sales_file=sales_file, mtime=os.path.getmtime(sales_file))
     
     fig_sales = px.bar(category_summary, x='Category', y='Total Sales', color='Total Sales', text='Total Sales', title="Total Sales by Category")
     st.plotly_chart(fig_sales, use_container_width=True)
@@ -178,9 +222,7 @@ if not (item_search or barcode_search):
 # Item-wise Table
 # ================================
 st.markdown("### 📝 Item-wise Details")
-table_cols = ['Item Bar Code','Item Name','Cost','Selling','Stock', 'Total Sales','Total Profit','Overall GP',
-              'Jul-2025 Total Sales','Jul-2025 Total Profit', 'Aug-2025 Total Sales','Aug-2025 Total Profit',
-              'Sep-2025 Total Sales','Sep-2025 Total Profit']
+table_cols = ['Item Bar Code','Item Name','Cost','Selling','Stock', 'Total Sales','Total Profit','Overall GP'] + period_cols
 
 # Ensure all columns exist
 for col in table_cols:
@@ -191,4 +233,6 @@ for col in table_cols:
 filtered_df['Overall GP'] = filtered_df['Overall GP'].apply(lambda x: f"{x:.2%}")
 
 # Display sorted table
-st.dataframe(filtered_df[table_cols].sort_values('Total Sales', ascending=False))
+item_table = filtered_df[table_cols].sort_values('Total Sales', ascending=False)
+st.dataframe(item_table)
+download_buttons(item_table, "item_wise_details", key="item_table")